@@ -2,18 +2,21 @@ from views.main_window import MainWindow
 from views.grid_view import GridView
 from views.editor_view import EditorView
 from controller import AppController
+from utils.scheduler import FrameScheduler
 
 def main():
     win = MainWindow()
+    sched = FrameScheduler(win)
     editor = EditorView(win.right, on_apply=lambda: ctrl.on_apply_from_editor())
     editor.pack(fill="both", expand=True)
-    grid = GridView(win.left, display_limit=20,
-                    on_focus_in=lambda r,c: ctrl.on_cell_focus_in(r,c),
-                    on_focus_out=lambda r,c,text: ctrl.on_cell_focus_out(r,c,text))
-    grid.pack(fill="both", expand=True)
+
+    # 每个标签页一个网格，由控制器按文档创建
+    def make_grid(master, on_focus_in, on_focus_out, on_header):
+        return GridView(master, display_limit=20, on_focus_in=on_focus_in,
+                        on_focus_out=on_focus_out, scheduler=sched, on_header=on_header)
 
     global ctrl
-    ctrl = AppController(win, grid, editor)
+    ctrl = AppController(win, make_grid, editor, sched)
     win.mainloop()
 
 if __name__ == "__main__":
@@ -1,107 +1,337 @@
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, simpledialog, ttk
 from model.sheet import Sheet
+from model.workspace import DEFAULT_MEMORY_CAP, Document, Workspace
 from services.csv_service import load_csv, save_csv
+from services.diff_service import diff_sheet_csv
+from utils.autofit import DEFAULT_COL_PX, QUANTILE, column_widths
+from utils.labels import col_index, col_label
 from utils.text import truncate_with_ellipsis
 
 class AppController:
-    def __init__(self, main_window, grid_view, editor_view):
+    def __init__(self, main_window, make_grid, editor_view, scheduler, memory_cap: int = DEFAULT_MEMORY_CAP):
         self.win = main_window
-        self.grid = grid_view
+        self.make_grid = make_grid   # (master, on_focus_in, on_focus_out, on_header) -> GridView
         self.editor = editor_view
-        self.sheet = Sheet()
-        self.current_path: str | None = None
-        self._in_cell_focus = False
+        self.sched = scheduler
+        self.docs = Workspace(memory_cap, on_drop_grid=self._on_drop_grid)
+        self._focused: tuple[Document, int, int] | None = None   # 正在编辑的单元格 (文档, 行, 列)
         self.display_limit = 20
 
-        # 初次构建网格
-        self._refresh_grid()
+        self.win.tabs.bind("<<NotebookTabChanged>>", lambda e: self._on_tab_changed())
+        self.win.protocol("WM_DELETE_WINDOW", self.exit)
 
         # 菜单
         self._build_menu()
 
-    # 视图事件回调
-    def on_cell_focus_in(self, r: int, c: int):
-        self.sheet.current_cell = (r, c)
-        self._in_cell_focus = True
-        self._set_entry_text(r, c, self.sheet.get(r,c), editing=True)
-        self._load_editor_from_cell(r, c)
+        # 初始空白文档
+        self.new_document()
 
-    def on_cell_focus_out(self, r: int, c: int, text: str):
-        self._in_cell_focus = False
-        self.sheet.set(r, c, text)
-        self._set_entry_text(r, c, self.sheet.get(r,c), editing=False)
-        if self.sheet.current_cell == (r, c):
-            self._load_editor_from_cell(r, c)
+    # 当前文档
+    @property
+    def doc(self) -> Document | None: return self.docs.active
+    @property
+    def sheet(self) -> Sheet: return self.docs.active.sheet
+    @property
+    def grid(self): return self.docs.active.grid
+    @property
+    def current_path(self) -> str | None: return self.docs.active.path
+
+    # 视图事件回调（按文档绑定：切换标签后旧网格的 FocusOut 仍写回其所属文档）
+    # 单元格完整文本需立即可编辑；省略显示与右侧编辑器交给调度器合并
+    def on_cell_focus_in(self, doc: Document, r: int, c: int):
+        doc.sheet.current_cell = (r, c)
+        self._focused = (doc, r, c)
+        self.sched.cancel(("entry", id(doc), r, c))
+        self._set_entry_text(r, c, doc.sheet.get(r,c), editing=True, doc=doc)
+        self._request_editor_load()
+
+    def on_cell_focus_out(self, doc: Document, r: int, c: int, text: str):
+        self._focused = None
+        if not doc.resident: return   # 换出前已写回
+        self._commit_cell(doc, r, c, text)
+        self.sched.request(("entry", id(doc), r, c), self._show_cell_ellipsis, doc, r, c)
+        if doc is self.doc and doc.sheet.current_cell == (r, c):
+            self._request_editor_load()
 
     def on_apply_from_editor(self):
         if not self.sheet.current_cell:
-            self.win.status_var.set("No cell selected."); return
+            self._set_status("No cell selected."); return
+        self.sched.flush(("editor",))   # 编辑器可能还停留在上一个单元格
         r, c = self.sheet.current_cell
         txt = self.editor.get_value()
-        self.sheet.set(r, c, txt)
-        self._set_entry_text(r, c, txt, editing=self._in_cell_focus)
-        self.win.status_var.set(f"Updated cell ({r+1}, {c+1}) from editor.")
+        self._commit_cell(self.doc, r, c, txt)
+        self._set_entry_text(r, c, txt, editing=self._focused == (self.doc, r, c))
+        self._set_status(f"Updated cell ({r+1}, {c+1}) from editor.")
 
     # 文件
+    def new_document(self):
+        self._add_document(Document(Sheet()))
+
     def open_csv(self):
         path = filedialog.askopenfilename(title="Open CSV",
                                           filetypes=[("CSV files","*.csv"),("All files","*.*")])
         if not path: return
+        for doc in self.docs.docs:
+            if doc.path == path:
+                self._activate(doc); return
         try:
             data = load_csv(path)
         except Exception as e:
             messagebox.showerror("Open CSV Failed", f"{e}"); return
-        self.sheet.replace_all(data)
-        self.current_path = path
-        self.win.status_var.set(f"Opened: {path}")
-        self._refresh_grid()
+        sheet = Sheet(0, 0)
+        sheet.replace_all(data, copy=False)
+        # 未改动的空白文档直接让位给打开的文件（先写回正在编辑的单元格再判断）
+        if self.doc and self.doc.resident: self._commit_focused_cell(self.doc)
+        blank = self.doc if self.doc and self.doc.path is None and not self.doc.dirty else None
+        self._add_document(Document(sheet, path))
+        if blank: self._forget(blank)
+        self._set_status(f"Opened: {path}")
 
     def save_csv(self):
-        if not self.current_path: return self.save_csv_as()
-        try:
-            save_csv(self.current_path, self.sheet.to_list())
-        except Exception as e:
-            messagebox.showerror("Save CSV Failed", f"{e}"); return
-        self.win.status_var.set(f"Saved: {self.current_path}")
+        self._save(self.doc)
 
     def save_csv_as(self):
-        path = filedialog.asksaveasfilename(title="Save CSV As",
-                                            defaultextension=".csv",
-                                            filetypes=[("CSV files","*.csv"),("All files","*.*")])
+        self._save(self.doc, ask_path=True)
+
+    def close_document(self) -> bool:
+        doc = self.doc
+        if not self._confirm_discard(doc): return False
+        self._forget(doc)
+        if not self.docs.docs: self.new_document()
+        return True
+
+    def exit(self):
+        for doc in list(self.docs.docs):
+            if not self._confirm_discard(doc): return
+        self.docs.close()
+        self.win.destroy()
+
+    # 比较
+    def compare_with_file(self):
+        path = filedialog.askopenfilename(title="Compare With CSV",
+                                          filetypes=[("CSV files","*.csv"),("All files","*.*")])
         if not path: return
-        self.current_path = path
-        self.save_csv()
+        self._compare(path)
+
+    def compare_with_saved(self):
+        if not self.current_path:
+            self._set_status("No saved file to compare with."); return
+        self._compare(self.current_path)
+
+    def clear_diff(self):
+        self.grid.clear_marks()
+        self._set_status("Cleared diff highlights.")
+
+    # 列宽
+    def autofit_columns(self):
+        self.doc.col_widths.clear()
+        self._autofit(self.doc)
+        self._set_status("Auto-fitted column widths.")
+
+    def set_column_width(self, c: int | None = None):
+        if c is None:
+            label = simpledialog.askstring("Column Width", "Column (e.g. A):", parent=self.win)
+            if not label: return
+            try:
+                c = col_index(label)
+            except ValueError as e:
+                messagebox.showerror("Column Width", f"{e}"); return
+        if not 0 <= c < self.sheet.cols: return
+        txt = simpledialog.askstring("Column Width", f"Width of column {col_label(c)} in pixels (blank = auto):",
+                                     parent=self.win)
+        if txt is None: return
+        if txt.strip():
+            try:
+                self.doc.col_widths[c] = max(20, int(txt))
+            except ValueError:
+                messagebox.showerror("Column Width", f"Not a number: {txt!r}"); return
+        else:
+            self.doc.col_widths.pop(c, None)
+        self.grid.set_col_widths(self._col_widths(self.doc))
 
     # 内部
     def _build_menu(self):
         import tkinter as tk
         m = tk.Menu(self.win)
         filemenu = tk.Menu(m, tearoff=False)
+        filemenu.add_command(label="New        Ctrl+N", command=self.new_document)
         filemenu.add_command(label="Open...    Ctrl+O", command=self.open_csv)
         filemenu.add_command(label="Save       Ctrl+S", command=self.save_csv)
         filemenu.add_command(label="Save As...", command=self.save_csv_as)
+        filemenu.add_command(label="Close Tab  Ctrl+W", command=self.close_document)
         filemenu.add_separator()
-        filemenu.add_command(label="Exit", command=self.win.destroy)
+        filemenu.add_command(label="Exit", command=self.exit)
         m.add_cascade(label="File", menu=filemenu)
+        cmpmenu = tk.Menu(m, tearoff=False)
+        cmpmenu.add_command(label="Compare With File...", command=self.compare_with_file)
+        cmpmenu.add_command(label="Compare With Saved", command=self.compare_with_saved)
+        cmpmenu.add_separator()
+        cmpmenu.add_command(label="Clear Highlights", command=self.clear_diff)
+        m.add_cascade(label="Compare", menu=cmpmenu)
+        viewmenu = tk.Menu(m, tearoff=False)
+        viewmenu.add_command(label="Auto-fit Columns", command=self.autofit_columns)
+        viewmenu.add_command(label="Set Column Width...", command=self.set_column_width)
+        m.add_cascade(label="View", menu=viewmenu)
         self.win.config(menu=m)
+        self.win.bind_all("<Control-n>", lambda e: self.new_document())
         self.win.bind_all("<Control-o>", lambda e: self.open_csv())
         self.win.bind_all("<Control-s>", lambda e: self.save_csv())
+        self.win.bind_all("<Control-w>", lambda e: self.close_document())
+
+    # 文档与标签页
+    def _add_document(self, doc: Document):
+        doc.frame = ttk.Frame(self.win.tabs)
+        self.win.tabs.add(doc.frame, text=doc.label())
+        self.docs.add(doc)
+        self._activate(doc)
+
+    def _activate(self, doc: Document):
+        prev = self.doc
+        if prev is not None and prev.resident: self._commit_focused_cell(prev)
+        self._focused = None
+        try:
+            self.docs.activate(doc)   # 必要时从换出文件恢复，并换出超出内存上限的旧文档
+        except Exception as e:
+            # 恢复失败时 docs.active 仍是 prev，把标签页切回去保持一致
+            messagebox.showerror("Restore Failed", f"{doc.name}: {e}")
+            if prev is not None: self.win.tabs.select(prev.frame)
+            return
+        if doc.grid is None: self._build_grid(doc)
+        if str(self.win.tabs.select()) != str(doc.frame): self.win.tabs.select(doc.frame)
+        self._update_title()
+        self._request_editor_load()
+
+    def _on_tab_changed(self):
+        sel = str(self.win.tabs.select())
+        doc = next((d for d in self.docs.docs if str(d.frame) == sel), None)
+        if doc is not None and doc is not self.doc: self._activate(doc)
 
-    def _refresh_grid(self):
-        data = self.sheet.to_list()
-        self.grid.rebuild(data)
-        # 标题
-        name = (self.current_path or "Untitled").split("/")[-1]
-        r, c = self.sheet.shape()
-        self.win.title(f"Mini CSV - {name}  ({r} x {c})")
+    def _forget(self, doc: Document):
+        self.docs.remove(doc)
+        self.win.tabs.forget(doc.frame)
+        doc.frame.destroy()
+        doc.grid = None
+        if self.doc is None and self.docs.docs: self._on_tab_changed()
 
-    def _set_entry_text(self, r: int, c: int, full_text: str, editing: bool):
+    def _on_drop_grid(self, doc: Document):
+        doc.view = doc.grid.view_state()
+        doc.grid.destroy()
+
+    def _build_grid(self, doc: Document):
+        doc.grid = self.make_grid(doc.frame,
+                                  lambda r,c: self.on_cell_focus_in(doc, r, c),
+                                  lambda r,c,text: self.on_cell_focus_out(doc, r, c, text),
+                                  lambda c: self.set_column_width(c))
+        doc.grid.pack(fill="both", expand=True)
+        doc.grid.restore_view(*doc.view)
+        doc.grid.rebuild(doc.sheet.rows_view(), col_widths=self._col_widths(doc))
+        # 自动列宽只读采样统计，放到下一帧计算，不阻塞打开
+        self.sched.request(("autofit", id(doc)), self._autofit, doc)
+
+    def _autofit(self, doc: Document):
+        if not doc.resident or doc.grid is None: return
+        doc.auto_widths = column_widths(doc.sheet, doc.grid.cell_font(), self.display_limit)
+        doc.grid.set_col_widths(self._col_widths(doc))
+
+    def _col_widths(self, doc: Document) -> list[int]:
+        auto = doc.auto_widths + [DEFAULT_COL_PX] * (doc.sheet.cols - len(doc.auto_widths))
+        return [doc.col_widths.get(c, w) for c, w in enumerate(auto)]
+
+    def _update_title(self):
+        doc = self.doc
+        r, c = doc.sheet.shape()
+        self.win.title(f"Mini CSV - {doc.label()}  ({r} x {c})")
+
+    def _commit_cell(self, doc: Document, r: int, c: int, text: str):
+        if doc.sheet.get(r, c) == text: return
+        before = doc.sheet.stats.quantile(c, QUANTILE)
+        doc.sheet.set(r, c, text)
+        if not doc.dirty: self._set_dirty(doc, True)
+        # 编辑使该列变宽时在下一帧重新自动列宽；手动列宽不受影响
+        if c not in doc.col_widths and doc.sheet.stats.quantile(c, QUANTILE) > before:
+            self.sched.request(("autofit", id(doc)), self._autofit, doc)
+
+    def _commit_focused_cell(self, doc: Document):
+        # 正在编辑的单元格尚未 FocusOut，先写回；其他文档的 Entry 只是省略显示，不能读回
+        if self._focused is None or self._focused[0] is not doc or doc.grid is None: return
+        _, r, c = self._focused
         try:
-            ent = self.grid.entries[r][c]
+            self._commit_cell(doc, r, c, doc.grid.entries[r][c].get())
+        except IndexError:
+            pass
+
+    def _set_dirty(self, doc: Document, dirty: bool):
+        doc.dirty = dirty
+        self.win.tabs.tab(doc.frame, text=doc.label())
+        if doc is self.doc: self._update_title()
+
+    def _save(self, doc: Document, ask_path: bool = False) -> bool:
+        if ask_path or not doc.path:
+            path = filedialog.asksaveasfilename(title="Save CSV As",
+                                                defaultextension=".csv",
+                                                filetypes=[("CSV files","*.csv"),("All files","*.*")])
+            if not path: return False
+            doc.path = path
+        if doc.resident: self._commit_focused_cell(doc)
+        try:
+            save_csv(doc.path, self.docs.rows(doc))
+        except Exception as e:
+            messagebox.showerror("Save CSV Failed", f"{e}"); return False
+        self._set_dirty(doc, False)
+        self._set_status(f"Saved: {doc.path}")
+        return True
+
+    def _confirm_discard(self, doc: Document) -> bool:
+        if doc.resident: self._commit_focused_cell(doc)
+        if not doc.dirty: return True
+        ans = messagebox.askyesnocancel("Unsaved Changes", f"Save changes to {doc.name}?")
+        if ans is None: return False
+        return self._save(doc) if ans else True
+
+    def _compare(self, path: str):
+        key = simpledialog.askstring("Compare", "Key column (e.g. A), blank to align by row order:",
+                                     parent=self.win)
+        if key is None: return
+        self._commit_focused_cell(self.doc)
+        try:
+            key_col = col_index(key) if key.strip() else None
+            diff = diff_sheet_csv(self.sheet.rows_view(), path, key_col)
+        except Exception as e:
+            messagebox.showerror("Compare Failed", f"{e}"); return
+        rows = {r: "added" for r in diff.added}
+        rows.update((r, "moved") for r, _ in diff.moved)
+        cells = {(r, c): "modified" for r, (_, cols) in diff.modified.items() for c in cols if c < self.sheet.cols}
+        self.grid.set_marks(rows, cells)
+        name = path.split("/")[-1]
+        if diff.is_empty():
+            self._set_status(f"No differences from {name}."); return
+        msg = f"Diff vs {name}: {diff.summary()}"
+        # 删除的行不在表格里，无法高亮，列出其在对比文件中的行号
+        if diff.removed: msg += f"; removed rows in {name}: {diff.removed_rows_text()}"
+        self._set_status(msg)
+
+    def _set_entry_text(self, r: int, c: int, full_text: str, editing: bool, doc: Document | None = None):
+        try:
+            ent = (doc or self.doc).grid.entries[r][c]
         except Exception:
             return
         ent.delete(0, "end")
         ent.insert(0, full_text if editing else truncate_with_ellipsis(full_text, self.display_limit))
 
+    def _show_cell_ellipsis(self, doc: Document, r: int, c: int):
+        if doc.resident and doc.grid is not None:
+            self._set_entry_text(r, c, doc.sheet.get(r, c), editing=False, doc=doc)
+
     def _load_editor_from_cell(self, r: int, c: int):
         self.editor.set_value(self.sheet.get(r, c))
+
+    def _request_editor_load(self):
+        # 只装载最终停留的单元格，快速 Tab/方向键切换时跳过中间格
+        def load():
+            if self.doc is None: return
+            if self.sheet.current_cell: self._load_editor_from_cell(*self.sheet.current_cell)
+            else: self.editor.set_value("")
+        self.sched.request(("editor",), load)
+
+    def _set_status(self, msg: str):
+        self.sched.request(("status",), self.win.status_var.set, msg)
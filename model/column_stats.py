@@ -0,0 +1,54 @@
+from typing import Iterable, List, Set
+
+MAX_TRACKED_LEN = 256   # 超过该长度的单元格归入最后一个桶
+SAMPLE_ROWS = 2000      # 打开大表时参与统计的行数上限
+
+
+class ColumnStats:
+    """按列的单元格长度直方图，覆盖采样行与编辑过的行，用于 O(1) 估算长度分位数。"""
+
+    def __init__(self, cols: int):
+        self.hist: List[List[int]] = [[0] * (MAX_TRACKED_LEN + 1) for _ in range(cols)]
+        self.tracked: Set[int] = set()   # 已计入直方图的行号
+
+    @classmethod
+    def sample(cls, data: List[List[str]]) -> "ColumnStats":
+        """等间隔抽取至多 SAMPLE_ROWS 行建立初始统计。"""
+        stats = cls(len(data[0]) if data else 0)
+        step = max(1, len(data) // SAMPLE_ROWS)
+        for r in range(0, len(data), step): stats.track(r, data[r])
+        return stats
+
+    # 维护
+    def track(self, r: int, row: Iterable[str]) -> None:
+        if r in self.tracked: return
+        self.tracked.add(r)
+        for h, s in zip(self.hist, row): h[min(len(s), MAX_TRACKED_LEN)] += 1
+
+    def untrack(self, r: int, row: Iterable[str]) -> None:
+        if r not in self.tracked: return
+        self.tracked.discard(r)
+        for h, s in zip(self.hist, row): h[min(len(s), MAX_TRACKED_LEN)] -= 1
+
+    def update(self, c: int, old: str, new: str) -> None:
+        h = self.hist[c]
+        h[min(len(old), MAX_TRACKED_LEN)] -= 1
+        h[min(len(new), MAX_TRACKED_LEN)] += 1
+
+    def add_col(self) -> None:
+        h = [0] * (MAX_TRACKED_LEN + 1); h[0] = len(self.tracked)
+        self.hist.append(h)
+
+    def del_col(self) -> None:
+        self.hist.pop()
+
+    # 查询
+    def quantile(self, c: int, q: float) -> int:
+        """第 c 列长度的 q 分位数（字符数）。"""
+        h = self.hist[c]
+        need = q * sum(h)
+        acc = 0
+        for n, count in enumerate(h):
+            acc += count
+            if count and acc >= need: return n
+        return 0
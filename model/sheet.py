@@ -1,9 +1,13 @@
 from typing import List, Optional, Tuple
 
+from model.column_stats import ColumnStats
+
 class Sheet:
     def __init__(self, rows: int = 30, cols: int = 15):
         self._data: List[List[str]] = [["" for _ in range(cols)] for _ in range(rows)]
         self.current_cell: Optional[Tuple[int, int]] = None
+        self._chars = 0   # 全部单元格字符数，随写入增量维护
+        self.stats = ColumnStats.sample(self._data)   # 列长度分位数，供自动列宽使用
 
     # 尺寸
     @property
@@ -14,27 +18,46 @@ class Sheet:
 
     # 读写
     def get(self, r: int, c: int) -> str: return self._data[r][c]
-    def set(self, r: int, c: int, val: str) -> None: self._data[r][c] = val
+    def set(self, r: int, c: int, val: str) -> None:
+        row = self._data[r]
+        self._chars += len(val) - len(row[c])
+        if r in self.stats.tracked: self.stats.update(c, row[c], val)
+        row[c] = val
+        self.stats.track(r, row)
 
     # 增删
-    def add_row_end(self) -> None: self._data.append(["" for _ in range(self.cols)])
+    def add_row_end(self) -> None:
+        self._data.append(["" for _ in range(self.cols)])
+        self.stats.track(self.rows - 1, self._data[-1])
     def del_row_end(self) -> bool:
         if self.rows <= 1: return False
-        self._data.pop()
+        self.stats.untrack(self.rows - 1, self._data[-1])
+        self._chars -= sum(map(len, self._data.pop()))
         return True
 
     def add_col_end(self) -> None:
         for r in range(self.rows): self._data[r].append("")
+        self.stats.add_col()
     def del_col_end(self) -> bool:
         if self.cols <= 1: return False
-        for r in range(self.rows): self._data[r].pop()
+        for r in range(self.rows): self._chars -= len(self._data[r].pop())
+        self.stats.del_col()
         return True
 
     # 替换全部数据（打开文件后）
-    def replace_all(self, data: List[List[str]]) -> None:
+    def replace_all(self, data: List[List[str]], copy: bool = True) -> None:
         if not data or not data[0]: data = [[""]]
-        self._data = [row[:] for row in data]
+        self._data = [row[:] for row in data] if copy else data
+        self._chars = sum(sum(map(len, row)) for row in self._data)
+        self.stats = ColumnStats.sample(self._data)
         self.current_cell = None
 
     def to_list(self) -> List[List[str]]:
         return [row[:] for row in self._data]
+
+    # 粗略内存估算（str 对象与行列表开销 + 字符数），O(1)，供文档缓存淘汰使用
+    def approx_bytes(self) -> int:
+        return self.rows * (56 + 8 * self.cols) + self.rows * self.cols * 50 + self._chars
+
+    # 只读视图：大表比较等场景避免整表复制，调用方不得修改
+    def rows_view(self) -> List[List[str]]: return self._data
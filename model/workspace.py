@@ -0,0 +1,113 @@
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from model.sheet import Sheet
+from services.spill_service import discard_spill, restore_rows, spill_rows
+
+DEFAULT_MEMORY_CAP = 512 * 1024 * 1024
+GRID_CELL_BYTES = 4096   # 每个已构建的网格单元格（Frame + Entry）的粗略开销
+
+
+class Document:
+    """一个打开的文件：表格数据、路径、未保存标记，以及所在标签页与网格。"""
+
+    def __init__(self, sheet: Sheet, path: Optional[str] = None):
+        self.sheet: Optional[Sheet] = sheet   # 换出到磁盘时为 None
+        self.path = path
+        self.dirty = False
+        self.frame = None                     # 标签页容器
+        self.grid = None                      # GridView，换出时销毁
+        self.view = (0.0, 0.0)                # 换出前的滚动位置
+        self.auto_widths: List[int] = []      # 自动列宽（像素）
+        self.col_widths: Dict[int, int] = {}  # 用户手动指定的列宽，优先于自动列宽
+        self.spill_path: Optional[str] = None
+
+    @property
+    def resident(self) -> bool: return self.sheet is not None
+
+    @property
+    def name(self) -> str: return (self.path or "Untitled").split("/")[-1]
+
+    def label(self) -> str: return ("*" if self.dirty else "") + self.name
+
+
+class Workspace:
+    """打开的文档集合：按 LRU 保留在内存中。总量超过上限时先销毁最久未用的非活动文档的网格，
+    仍超上限才把其表格数据换出到磁盘。"""
+
+    def __init__(self, memory_cap: int = DEFAULT_MEMORY_CAP,
+                 on_drop_grid: Optional[Callable[[Document], None]] = None):
+        self.memory_cap = memory_cap
+        self.on_drop_grid = on_drop_grid   # 销毁 doc.grid 前调用（保存滚动位置等）
+        self.docs: List[Document] = []   # 标签顺序
+        self.active: Optional[Document] = None
+        self._lru: "OrderedDict[int, Document]" = OrderedDict()   # 常驻文档，最近使用在末尾
+
+    def add(self, doc: Document) -> None:
+        self.docs.append(doc)
+        if doc.resident: self._lru[id(doc)] = doc
+
+    def remove(self, doc: Document) -> None:
+        self.docs.remove(doc)
+        self._lru.pop(id(doc), None)
+        if doc.spill_path:
+            discard_spill(doc.spill_path); doc.spill_path = None
+        if self.active is doc: self.active = None
+
+    def activate(self, doc: Document) -> None:
+        if not doc.resident: self._restore(doc)
+        self.active = doc
+        self._lru[id(doc)] = doc
+        self._lru.move_to_end(id(doc))
+        self._evict_over_cap()
+
+    def rows(self, doc: Document) -> List[List[str]]:
+        """读取文档数据而不改变其常驻状态（保存已换出的文档时使用）。"""
+        return doc.sheet.rows_view() if doc.resident else restore_rows(doc.spill_path)[0]
+
+    def resident_bytes(self) -> int:
+        return sum(map(self._measure, self._lru.values()))
+
+    def close(self) -> None:
+        for doc in self.docs:
+            if doc.spill_path: discard_spill(doc.spill_path)
+
+    # 内部
+    def _measure(self, doc: Document) -> int:
+        n = doc.sheet.approx_bytes()
+        if doc.grid is not None: n += doc.sheet.rows * doc.sheet.cols * GRID_CELL_BYTES
+        return n
+
+    def _evict_over_cap(self):
+        total = self.resident_bytes()
+        # 第一层：网格开销远大于数据，先销毁网格，切回时从内存中的表格重建即可
+        for doc in list(self._lru.values()):
+            if total <= self.memory_cap: return
+            if doc is self.active or doc.grid is None: continue
+            total -= self._measure(doc)
+            self._drop_grid(doc)
+            total += self._measure(doc)
+        # 第二层：只剩数据仍超上限时才换出到磁盘
+        for doc in list(self._lru.values()):
+            if total <= self.memory_cap: break
+            if doc is self.active: continue
+            total -= self._measure(doc)
+            self._spill(doc)
+
+    def _drop_grid(self, doc: Document):
+        if self.on_drop_grid: self.on_drop_grid(doc)
+        doc.grid = None
+
+    def _spill(self, doc: Document):
+        if doc.grid is not None: self._drop_grid(doc)
+        # 同一文档复用换出文件，未保存的修改随数据一起写出
+        doc.spill_path = spill_rows(doc.sheet.rows_view(), doc.sheet.current_cell, doc.spill_path)
+        doc.sheet = None
+        del self._lru[id(doc)]
+
+    def _restore(self, doc: Document):
+        rows, cell = restore_rows(doc.spill_path)
+        sheet = Sheet(0, 0)
+        sheet.replace_all(rows, copy=False)   # 刚从换出文件解析的行无需再复制
+        sheet.current_cell = cell
+        doc.sheet = sheet
@@ -0,0 +1,214 @@
+import csv
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+GAP_LCS_LIMIT = 250_000   # 无锚点区间 la*lb 不超过该值时才做精确 LCS，否则顺序贪心匹配
+RESYNC_WINDOW = 64        # 贪心匹配失配时向前查找重新对齐点的最大行数
+RESYNC_RUN = 16           # 连续相等这么多行即认为已重新对齐
+
+
+class SheetDiff:
+    """表格与另一份 CSV 的结构化差异。行号：new 指当前表格，old 指对比文件。"""
+
+    def __init__(self):
+        self.added: List[int] = []                          # new 行
+        self.removed: List[int] = []                        # old 行
+        self.moved: List[Tuple[int, int]] = []              # (new 行, old 行)
+        self.modified: Dict[int, Tuple[int, List[int]]] = {}  # new 行 -> (old 行, 变化的列)
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.moved or self.modified)
+
+    def summary(self) -> str:
+        cells = sum(len(cols) for _, cols in self.modified.values())
+        return (f"+{len(self.added)} rows, -{len(self.removed)} rows, "
+                f"{len(self.moved)} moved, {len(self.modified)} modified ({cells} cells)")
+
+    def removed_rows_text(self, limit: int = 10) -> str:
+        """被删除行在对比文件中的行号（从 1 起），超过 limit 个时省略其余。"""
+        shown = ", ".join(str(i + 1) for i in self.removed[:limit])
+        more = len(self.removed) - limit
+        return shown + (f" (+{more} more)" if more > 0 else "")
+
+
+def diff_sheet_csv(rows: Sequence[List[str]], path: str, key_col: Optional[int] = None) -> SheetDiff:
+    """流式读取 path，与内存中的 rows 比较；key_col 为 None 时按行序做 LCS 对齐。"""
+    new_h = list(map(_row_hash, rows))
+    if key_col is None:
+        old_h = list(map(_row_hash, _iter_csv(path)))
+        diff = _diff_by_order(old_h, new_h)
+    else:
+        old_h, old_keys = [], []
+        for r in _iter_csv(path):
+            old_h.append(_row_hash(r)); old_keys.append(_cell(r, key_col))
+        new_keys = [_cell(r, key_col) for r in rows]
+        diff = _diff_by_key(old_h, old_keys, new_h, new_keys)
+
+    # 第二遍：只取回被修改行的原始内容做逐格比较
+    wanted = {o: n for n, (o, _) in diff.modified.items()}
+    if wanted:
+        last = max(wanted)
+        for i, r in enumerate(_iter_csv(path)):
+            n = wanted.get(i)
+            if n is not None: diff.modified[n] = (i, _changed_cols(r, rows[n]))
+            if i >= last: break
+    return diff
+
+
+# 对齐
+def _diff_by_order(old_h: List[int], new_h: List[int]) -> SheetDiff:
+    pairs = _align(old_h, new_h)
+    diff = SheetDiff()
+    # 未对齐的区间：内容相同的视为移动，其余在区间内按位置配对为修改
+    gaps = []
+    pi, pj = 0, 0
+    pairs.append((len(old_h), len(new_h)))
+    for i, j in pairs:
+        if i > pi or j > pj: gaps.append((list(range(pi, i)), list(range(pj, j))))
+        pi, pj = i + 1, j + 1
+    pool: Dict[int, List[int]] = {}
+    for olds, _ in reversed(gaps):
+        for i in reversed(olds): pool.setdefault(old_h[i], []).append(i)
+    moved_old = set()
+    for _, news in gaps:
+        for j in news:
+            cand = pool.get(new_h[j])
+            if cand:
+                i = cand.pop()
+                moved_old.add(i); diff.moved.append((j, i))
+    moved_new = {j for j, _ in diff.moved}
+    for olds, news in gaps:
+        olds = [i for i in olds if i not in moved_old]
+        news = [j for j in news if j not in moved_new]
+        for i, j in zip(olds, news): diff.modified[j] = (i, [])
+        diff.removed.extend(olds[len(news):])
+        diff.added.extend(news[len(olds):])
+    diff.moved.sort()
+    return diff
+
+
+def _diff_by_key(old_h, old_keys, new_h, new_keys) -> SheetDiff:
+    diff = SheetDiff()
+    # 重复键按出现次序区分：第 n 个 k 只与对方第 n 个 k 配对
+    old_index = {k: i for i, k in enumerate(_occurrences(old_keys))}
+    matched: List[Tuple[int, int]] = []
+    for j, k in enumerate(_occurrences(new_keys)):
+        i = old_index.pop(k, None)
+        if i is None:
+            diff.added.append(j); continue
+        matched.append((j, i))
+        if old_h[i] != new_h[j]: diff.modified[j] = (i, [])
+    diff.removed = sorted(old_index.values())
+    # 相对次序不在最长递增子序列里的键视为移动
+    keep = set(_lis([i for _, i in matched]))
+    diff.moved = [(j, i) for n, (j, i) in enumerate(matched) if n not in keep]
+    return diff
+
+
+def _align(a: List[int], b: List[int]) -> List[Tuple[int, int]]:
+    """patience 风格对齐：唯一行做锚点，锚点之间递归，小区间回退到 LCS。返回相等行对。"""
+    pairs: List[Tuple[int, int]] = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+        # 公共前后缀
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            pairs.append((alo, blo)); alo += 1; blo += 1
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1; bhi -= 1; pairs.append((ahi, bhi))
+        if alo >= ahi or blo >= bhi: continue
+
+        anchors = _unique_anchors(a, alo, ahi, b, blo, bhi)
+        if anchors:
+            prev_i, prev_j = alo, blo
+            for i, j in anchors:
+                pairs.append((i, j))
+                if i > prev_i or j > prev_j: stack.append((prev_i, i, prev_j, j))
+                prev_i, prev_j = i + 1, j + 1
+            stack.append((prev_i, ahi, prev_j, bhi))
+        elif (ahi - alo) * (bhi - blo) <= GAP_LCS_LIMIT:
+            sm = SequenceMatcher(None, a[alo:ahi], b[blo:bhi], autojunk=False)
+            for i, j, n in sm.get_matching_blocks():
+                pairs.extend((alo + i + k, blo + j + k) for k in range(n))
+        else:
+            pairs.extend(_greedy_pairs(a, alo, ahi, b, blo, bhi))
+    pairs.sort()
+    return pairs
+
+
+def _greedy_pairs(a, alo, ahi, b, blo, bhi) -> List[Tuple[int, int]]:
+    """大区间的近似对齐：按顺序配对相等行，失配时在窗口内找后续连续相等最长的偏移重新对齐。
+    低基数数据（大量重复行）没有唯一锚点，逐位置比较可避免把原地未动的行误判为移动。"""
+    pairs: List[Tuple[int, int]] = []
+    i, j = alo, blo
+    while i < ahi and j < bhi:
+        if a[i] == b[j]:
+            pairs.append((i, j)); i += 1; j += 1; continue
+        best = (0, 0, 0)   # (连续相等行数, di, dj)
+        for d in range(1, RESYNC_WINDOW + 1):
+            # 依次尝试：改了 d 行、插入 d 行、删除 d 行
+            for di, dj in ((d, d), (0, d), (d, 0)):
+                run = _run(a, i + di, ahi, b, j + dj, bhi)
+                if run > best[0]: best = (run, di, dj)
+            if best[0] >= RESYNC_RUN: break
+        if not best[0]: break   # 窗口内找不到重新对齐点，剩余部分留作未对齐区间
+        i += best[1]; j += best[2]
+    return pairs
+
+
+def _run(a, i, ahi, b, j, bhi) -> int:
+    n = 0
+    while n < RESYNC_RUN and i + n < ahi and j + n < bhi and a[i + n] == b[j + n]: n += 1
+    return n
+
+
+def _unique_anchors(a, alo, ahi, b, blo, bhi) -> List[Tuple[int, int]]:
+    pos_a: Dict[int, int] = {}
+    for i in range(alo, ahi):
+        h = a[i]; pos_a[h] = -1 if h in pos_a else i
+    pos_b: Dict[int, int] = {}
+    for j in range(blo, bhi):
+        h = b[j]
+        if pos_a.get(h, -1) >= 0: pos_b[h] = -1 if h in pos_b else j
+    cand = sorted((pos_a[h], j) for h, j in pos_b.items() if j >= 0)
+    keep = _lis([j for _, j in cand])
+    return [cand[n] for n in keep]
+
+
+def _lis(seq: List[int]) -> List[int]:
+    """最长严格递增子序列，返回其在 seq 中的下标。O(n log n)。"""
+    tails: List[int] = []; tail_idx: List[int] = []
+    prev = [-1] * len(seq)
+    for n, v in enumerate(seq):
+        k = bisect_left(tails, v)
+        if k == len(tails): tails.append(v); tail_idx.append(n)
+        else: tails[k] = v; tail_idx[k] = n
+        prev[n] = tail_idx[k - 1] if k else -1
+    out = []; n = tail_idx[-1] if tail_idx else -1
+    while n >= 0: out.append(n); n = prev[n]
+    return out[::-1]
+
+
+# 行与单元格
+def _iter_csv(path: str) -> Iterator[List[str]]:
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        yield from csv.reader(f)
+
+def _row_hash(row: Sequence[str]) -> int:
+    # load_csv 会补齐空列，比较时忽略行尾空单元格
+    if row and row[-1]: return hash(tuple(row))
+    n = len(row)
+    while n and not row[n - 1]: n -= 1
+    return hash(tuple(row[:n]))
+
+def _occurrences(keys: List[str]) -> Iterator[Tuple[str, int]]:
+    seen: Dict[str, int] = {}
+    for k in keys:
+        n = seen.get(k, 0); seen[k] = n + 1
+        yield (k, n)
+
+def _cell(row: Sequence[str], c: int) -> str: return row[c] if c < len(row) else ""
+
+def _changed_cols(old: Sequence[str], new: Sequence[str]) -> List[int]:
+    return [c for c in range(max(len(old), len(new))) if _cell(old, c) != _cell(new, c)]
@@ -0,0 +1,27 @@
+import marshal
+import os
+import tempfile
+from typing import List, Optional, Tuple
+
+# 换出文件使用 marshal：纯 list/str 结构读写远快于 csv/pickle，仅供本进程临时使用
+
+def spill_rows(rows: List[List[str]], current_cell: Optional[Tuple[int, int]],
+               path: Optional[str] = None) -> str:
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="structnote-", suffix=".spill")
+        os.close(fd)
+    with open(path, "wb") as f:
+        f.write(marshal.dumps((rows, current_cell)))
+    return path
+
+def restore_rows(path: str) -> Tuple[List[List[str]], Optional[Tuple[int, int]]]:
+    # 整块读入再解析，比 marshal.load(f) 逐段读取快数倍
+    with open(path, "rb") as f:
+        rows, cell = marshal.loads(f.read())
+    return rows, (tuple(cell) if cell else None)
+
+def discard_spill(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,43 @@
+from model.column_stats import ColumnStats
+from model.sheet import Sheet
+from utils.autofit import DEFAULT_COL_PX, MAX_COL_PX, MIN_COL_PX, PAD_PX, column_widths
+
+
+def test_column_stats_quantile_and_updates():
+    sheet = Sheet(0, 0)
+    sheet.replace_all([["x" * n, ""] for n in range(10)])
+    assert sheet.stats.quantile(0, 0.9) == 8
+    assert sheet.stats.quantile(1, 0.9) == 0
+    sheet.set(0, 1, "abcdef")
+    assert sum(sheet.stats.hist[1]) == 10
+    assert sheet.stats.quantile(1, 1.0) == 6
+    sheet.add_col_end()
+    assert sum(sheet.stats.hist[2]) == 10
+    sheet.del_row_end()
+    assert sum(sheet.stats.hist[0]) == 9
+
+
+def test_column_stats_sample_is_bounded_and_tracks_edits():
+    data = [["a"] for _ in range(100_000)]
+    stats = ColumnStats.sample(data)
+    assert len(stats.tracked) <= 2000 + 1
+    sheet = Sheet(0, 0)
+    sheet.replace_all(data, copy=False)
+    r = next(i for i in range(len(data)) if i not in sheet.stats.tracked)
+    sheet.set(r, 0, "x" * 300)
+    assert r in sheet.stats.tracked
+    assert sheet.stats.hist[0][-1] == 1   # 超长值归入最后一个桶
+
+
+class _MonoFont:
+    def actual(self): return {"family": "mono-test", "size": 10}
+    def measure(self, s): return 7 * len(s)
+
+
+def test_column_widths_fit_text_and_keep_default_for_empty_columns():
+    sheet = Sheet(0, 0)
+    sheet.replace_all([["x" * 30, "", "ab"] for _ in range(20)])
+    widths = column_widths(sheet, _MonoFont(), char_limit=20)
+    assert widths[0] == min(20 * 7 + PAD_PX, MAX_COL_PX)
+    assert widths[1] == DEFAULT_COL_PX
+    assert widths[2] == MIN_COL_PX
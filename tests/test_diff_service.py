@@ -0,0 +1,84 @@
+import csv
+import random
+
+from services.diff_service import SheetDiff, diff_sheet_csv
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+    return str(path)
+
+
+def test_diff_identical_ignores_trailing_padding(tmp_path):
+    path = _write_csv(tmp_path / "a.csv", [["id", "name"], ["1", "a", ""], ["2"]])
+    diff = diff_sheet_csv([["id", "name"], ["1", "a"], ["2", ""]], path)
+    assert diff.is_empty()
+
+
+def test_diff_by_order_added_removed_modified(tmp_path):
+    old = [["h"], ["a"], ["b"], ["c"], ["d"]]
+    path = _write_csv(tmp_path / "a.csv", old)
+    new = [["h"], ["a"], ["B"], ["c"], ["d"], ["e"]]
+    diff = diff_sheet_csv(new, path)
+    assert diff.modified == {2: (2, [0])}
+    assert diff.added == [5]
+    assert diff.removed == [] and diff.moved == []
+
+    diff = diff_sheet_csv([["h"], ["a"], ["c"], ["d"]], path)
+    assert diff.removed == [2] and diff.added == [] and not diff.modified
+
+
+def test_diff_by_order_detects_move(tmp_path):
+    old = [[str(i)] for i in range(10)]
+    path = _write_csv(tmp_path / "a.csv", old)
+    new = old[:2] + old[3:8] + [old[2]] + old[8:]
+    diff = diff_sheet_csv(new, path)
+    assert diff.moved == [(7, 2)]
+    assert not (diff.added or diff.removed or diff.modified)
+
+
+def test_diff_by_order_low_cardinality_gap_not_moved(tmp_path):
+    rnd = random.Random(0)
+    old = [[rnd.choice(["yes", "no", ""]), rnd.choice(["a", "b"])] for _ in range(5000)]
+    path = _write_csv(tmp_path / "a.csv", old)
+    new = [list(r) for r in old]
+    new.insert(100, ["inserted", "x"])
+    new[4001] = ["changed", "x"]
+    diff = diff_sheet_csv(new, path)
+    assert diff.added == [100]
+    assert list(diff.modified) == [4001] and diff.modified[4001][0] == 4000
+    assert diff.moved == [] and diff.removed == []
+
+    del new[4001]
+    diff = diff_sheet_csv(new, path)
+    assert diff.added == [100] and diff.removed == [4000]
+    assert diff.moved == [] and not diff.modified
+
+
+def test_diff_by_key_moves_and_cells(tmp_path):
+    old = [["id", "v"], ["1", "a"], ["2", "b"], ["3", "c"], ["4", "d"]]
+    path = _write_csv(tmp_path / "a.csv", old)
+    new = [["id", "v"], ["1", "a"], ["3", "C"], ["2", "b"], ["5", "e"]]
+    diff = diff_sheet_csv(new, path, key_col=0)
+    assert diff.added == [4]
+    assert diff.removed == [4]
+    assert diff.modified == {2: (3, [1])}
+    assert len(diff.moved) == 1
+    assert diff.removed_rows_text() == "5"
+
+
+def test_diff_by_key_pairs_duplicate_keys_in_order(tmp_path):
+    old = [["k", "x"], ["k", "y"], ["j", "z"]]
+    path = _write_csv(tmp_path / "a.csv", old)
+    new = [["k", "x"], ["k", "Y"], ["j", "z"], ["k", "w"]]
+    diff = diff_sheet_csv(new, path, key_col=0)
+    assert diff.modified == {1: (1, [1])}
+    assert diff.added == [3]
+    assert diff.removed == [] and diff.moved == []
+
+
+def test_removed_rows_text_truncates():
+    diff = SheetDiff()
+    diff.removed = list(range(15))
+    assert diff.removed_rows_text(limit=3) == "1, 2, 3 (+12 more)"
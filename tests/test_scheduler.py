@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+from utils import scheduler as scheduler_mod
+from utils.scheduler import FrameScheduler
+from utils.scoll import WHEEL_STEP_PX, wheel_pixels
+
+
+class FakeWidget:
+    """只实现 after：记录回调，由测试逐帧驱动。"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def after(self, ms, fn):
+        self.jobs.append(fn)
+        return len(self.jobs)
+
+    def run_frame(self):
+        jobs, self.jobs = self.jobs, []
+        for fn in jobs: fn()
+
+
+def test_latest_request_per_key_wins():
+    w = FakeWidget(); s = FrameScheduler(w)
+    out = []
+    for i in range(50): s.request("editor", out.append, i)
+    s.request("status", out.append, "ok")
+    assert len(w.jobs) == 1
+    w.run_frame()
+    assert out == [49, "ok"]
+    assert not w.jobs
+
+
+def test_requests_made_during_frame_run_next_frame():
+    w = FakeWidget(); s = FrameScheduler(w)
+    out = []
+    def chain(n):
+        out.append(n)
+        if n < 2: s.request("chain", chain, n + 1)
+    s.request("chain", chain, 0)
+    w.run_frame(); assert out == [0]
+    w.run_frame(); assert out == [0, 1]
+    w.run_frame(); assert out == [0, 1, 2]
+    assert not w.jobs
+
+
+def test_budget_cutoff_runs_at_least_one_task(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(scheduler_mod.time, "perf_counter", lambda: clock[0])
+    w = FakeWidget(); s = FrameScheduler(w, budget_ms=8)
+    out = []
+    def heavy(n):
+        out.append(n); clock[0] += 0.010   # 每个任务都超出整帧预算
+    for n in range(3): s.request(n, heavy, n)
+    w.run_frame(); assert out == [0]
+    w.run_frame(); assert out == [0, 1]
+    w.run_frame(); assert out == [0, 1, 2]
+
+
+def test_cancel_and_flush_reach_tasks_left_in_current_frame():
+    w = FakeWidget(); s = FrameScheduler(w)
+    out = []
+    def first():
+        out.append("first")
+        s.cancel("dropped")
+        s.flush("flushed")
+    s.request("first", first)
+    s.request("flushed", out.append, "flushed")
+    s.request("dropped", out.append, "dropped")
+    w.run_frame()
+    assert out == ["first", "flushed"]
+    w.run_frame()
+    assert out == ["first", "flushed"]
+
+
+def test_rerequest_during_frame_replaces_stale_batch_entry():
+    w = FakeWidget(); s = FrameScheduler(w)
+    out = []
+    s.request("a", lambda: s.request("b", out.append, "new"))
+    s.request("b", out.append, "old")
+    w.run_frame(); assert out == []
+    w.run_frame(); assert out == ["new"]
+
+
+def test_wheel_pixels_per_platform():
+    ev = lambda **kw: SimpleNamespace(**{"num": "??", "delta": 0, **kw})
+    assert wheel_pixels(ev(num=4), "x11") == -WHEEL_STEP_PX
+    assert wheel_pixels(ev(num=5), "x11") == WHEEL_STEP_PX
+    assert wheel_pixels(ev(num=6), "x11") == -WHEEL_STEP_PX
+    assert wheel_pixels(ev(num=7), "x11") == WHEEL_STEP_PX
+    assert wheel_pixels(ev(delta=120), "win32") == -WHEEL_STEP_PX
+    assert wheel_pixels(ev(delta=-240), "win32") == 2 * WHEEL_STEP_PX
+    assert wheel_pixels(ev(delta=30), "win32") == -WHEEL_STEP_PX // 4
+    assert wheel_pixels(ev(delta=1), "aqua") == -WHEEL_STEP_PX // 4
+    assert wheel_pixels(ev(delta=-4), "aqua") == WHEEL_STEP_PX
@@ -0,0 +1,72 @@
+import pytest
+
+from model.sheet import Sheet
+from model.workspace import GRID_CELL_BYTES, Document, Workspace
+
+
+def _doc(n, path):
+    sheet = Sheet(0, 0)
+    sheet.replace_all([[f"{path}-{i}-{j}" for j in range(5)] for i in range(n)])
+    return Document(sheet, path)
+
+
+def test_workspace_spills_lru_and_restores_edits():
+    ws = Workspace(memory_cap=1)
+    a, b, c = _doc(50, "a"), _doc(50, "b"), _doc(50, "c")
+    for d in (a, b, c):
+        ws.add(d); ws.activate(d)
+    try:
+        assert not a.resident and not b.resident and c.resident
+        assert ws.rows(a)[3][2] == "a-3-2"
+
+        ws.activate(b)
+        b.sheet.set(1, 1, "edited"); b.sheet.current_cell = (1, 1)
+        ws.activate(a)   # b 被换出，修改随之写盘
+        assert not b.resident and a.resident
+        ws.activate(b)
+        assert b.sheet.get(1, 1) == "edited"
+        assert b.sheet.current_cell == (1, 1)
+    finally:
+        ws.close()
+
+
+def test_workspace_keeps_docs_under_cap_and_discards_spill_on_remove():
+    ws = Workspace(memory_cap=10**9)
+    a, b = _doc(10, "a"), _doc(10, "b")
+    for d in (a, b):
+        ws.add(d); ws.activate(d)
+    assert a.resident and b.resident
+
+    ws.memory_cap = 1
+    ws.activate(b)
+    assert not a.resident
+    spill = a.spill_path
+    ws.remove(a)
+    assert a.spill_path is None
+    with pytest.raises(OSError):
+        open(spill, "rb")
+
+
+def test_workspace_drops_grids_before_spilling_data():
+    dropped = []
+    ws = Workspace(memory_cap=10**9, on_drop_grid=lambda d: dropped.append(d.path))
+    a, b, c = _doc(50, "a"), _doc(50, "b"), _doc(50, "c")
+    for d in (a, b, c):
+        ws.add(d); d.grid = object(); ws.activate(d)
+    grid_bytes = 50 * 5 * GRID_CELL_BYTES
+    data_bytes = sum(d.sheet.approx_bytes() for d in (a, b, c))
+    try:
+        # 上限足以容纳全部数据和一个网格：只销毁 a、b 的网格，不换出
+        ws.memory_cap = data_bytes + grid_bytes
+        ws.activate(c)
+        assert dropped == ["a", "b"]
+        assert a.grid is None and b.grid is None and c.grid is not None
+        assert a.resident and b.resident and a.spill_path is None
+
+        # 数据本身超过上限时才按 LRU 换出
+        ws.memory_cap = data_bytes + grid_bytes - 1
+        ws.activate(c)
+        assert not a.resident and b.resident and c.resident
+        assert dropped == ["a", "b"]
+    finally:
+        ws.close()
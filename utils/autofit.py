@@ -0,0 +1,43 @@
+from typing import Dict, List
+
+from utils.labels import col_label
+
+DEFAULT_COL_PX = 120   # 自动列宽算出之前的列宽
+MIN_COL_PX = 48
+MAX_COL_PX = 360
+PAD_PX = 14
+QUANTILE = 0.9
+SAMPLE_TEXTS = 200   # 每列最多测量的样本单元格数
+
+_char_px: Dict[str, Dict[str, int]] = {}   # 字体 -> 字符 -> 像素宽，跨文档共享
+
+
+def text_px(font, s: str) -> int:
+    """按字符累加宽度（忽略字距），每个字体只对新字符调用一次 Tk 测量。"""
+    key = str(font.actual())
+    cache = _char_px.setdefault(key, {})
+    total = 0
+    for ch in s:
+        w = cache.get(ch)
+        if w is None: w = cache[ch] = font.measure(ch)
+        total += w
+    return total
+
+
+def column_widths(sheet, font, char_limit: int) -> List[int]:
+    """由长度分位数与少量样本估算各列像素宽；char_limit 为单元格省略显示的字符上限。"""
+    rows = sheet.rows_view()
+    tracked = sorted(sheet.stats.tracked)
+    sample = tracked[::max(1, len(tracked) // SAMPLE_TEXTS)][:SAMPLE_TEXTS]   # 等间隔覆盖整列
+    widths = []
+    for c in range(sheet.cols):
+        n = min(sheet.stats.quantile(c, QUANTILE), char_limit)
+        # 样本单元格的平均字符宽度，使中日文等宽字符的列更宽
+        texts = [rows[r][c][:char_limit] for r in sample if r < len(rows) and rows[r][c]]
+        if not n or not texts:   # 空列（或样本中全空）保持默认宽度，便于之后填写
+            widths.append(DEFAULT_COL_PX); continue
+        chars = sum(map(len, texts))
+        per_char = text_px(font, "".join(texts)) / chars if chars else text_px(font, "0")
+        px = max(n * per_char, text_px(font, col_label(c))) + PAD_PX
+        widths.append(int(min(max(px, MIN_COL_PX), MAX_COL_PX)))
+    return widths
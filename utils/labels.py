@@ -6,3 +6,12 @@ def col_label(idx: int) -> str:
         idx, r = divmod(idx - 1, 26)
         s = ALPHABET[r] + s
     return s
+
+def col_index(label: str) -> int:
+    """col_label 的逆运算："A" -> 0；非法标签抛 ValueError。"""
+    label = label.strip().upper()
+    if not label or any(ch not in ALPHABET for ch in label):
+        raise ValueError(f"Invalid column label: {label!r}")
+    idx = 0
+    for ch in label: idx = idx * 26 + ALPHABET.index(ch) + 1
+    return idx - 1
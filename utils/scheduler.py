@@ -0,0 +1,65 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class FrameScheduler:
+    """基于 Tk after 的帧调度器：同一 key 只保留最新请求，每帧在时间预算内执行。"""
+
+    def __init__(self, widget, frame_ms: int = 16, budget_ms: float = 8.0):
+        self.widget = widget
+        self.frame_ms = frame_ms
+        self.budget_ms = budget_ms
+        self._pending: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._batch: "OrderedDict[Hashable, tuple]" = OrderedDict()   # 本帧尚未执行完的请求
+        self._job = None
+        self._deadline = None
+
+    # 请求
+    def request(self, key: Hashable, fn: Callable, *args) -> None:
+        self._batch.pop(key, None)   # 本帧里同 key 的旧请求已过时
+        self._pending[key] = (fn, args)
+        self._ensure_frame()
+
+    def cancel(self, key: Hashable) -> None:
+        self._batch.pop(key, None)
+        self._pending.pop(key, None)
+
+    def over_budget(self) -> bool:
+        """分片任务在循环中检查，超出本帧预算时应自行 request 续跑。"""
+        return self._deadline is not None and time.perf_counter() >= self._deadline
+
+    def flush(self, key: Hashable = None) -> None:
+        """立即执行积压请求；给定 key 时只执行该项。"""
+        if key is not None:
+            item = self._pending.pop(key, None) or self._batch.pop(key, None)
+            if item: item[0](*item[1])
+            return
+        for queue in (self._batch, self._pending):
+            while queue:
+                _, (fn, args) = queue.popitem(last=False)
+                fn(*args)
+
+    # 内部
+    def _ensure_frame(self):
+        if self._job is None and self._pending:
+            self._job = self.widget.after(self.frame_ms, self._run_frame)
+
+    def _run_frame(self):
+        self._job = None
+        self._deadline = time.perf_counter() + self.budget_ms / 1000.0
+        # 本帧只处理已积压的请求；执行中产生的新请求留到下一帧。
+        # 批次放在 self 上，回调里的 cancel/flush 也能作用于尚未执行的请求
+        self._batch, self._pending = self._pending, OrderedDict()
+        try:
+            # 至少执行一个任务，保证超预算的重任务也能推进
+            while self._batch:
+                _, (fn, args) = self._batch.popitem(last=False)
+                fn(*args)
+                if self.over_budget(): break
+        finally:
+            batch, self._batch = self._batch, OrderedDict()
+            for key, item in self._pending.items(): batch[key] = item
+            self._pending = batch
+            self._deadline = None
+            self._ensure_frame()
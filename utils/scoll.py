@@ -1,5 +1,29 @@
+WHEEL_STEP_PX = 60   # 一格滚轮对应的像素
+
+def wheel_pixels(event, windowing: str) -> int:
+    """把各平台的滚轮事件换算为像素位移（正数向下/向右）。"""
+    num = getattr(event, "num", None)
+    if num in (4, 6): return -WHEEL_STEP_PX     # X11 上/左
+    if num in (5, 7): return WHEEL_STEP_PX      # X11 下/右
+    if windowing == "aqua":                     # macOS：delta 为细粒度增量
+        return int(-event.delta * WHEEL_STEP_PX / 4)
+    return int(-event.delta * WHEEL_STEP_PX / 120)  # Windows：120 为一格，高精度滚轮更小
+
 def bind_mousewheel(widget, on_v, on_h):
-    widget.bind_all("<MouseWheel>", lambda e: on_v(-1 if e.delta > 0 else 1))
-    widget.bind_all("<Shift-MouseWheel>", lambda e: on_h(-1 if e.delta > 0 else 1))
-    widget.bind_all("<Button-4>", lambda e: on_v(-1))
-    widget.bind_all("<Button-5>", lambda e: on_v(1))
+    """全局绑定滚轮；on_v/on_h 接收 (像素位移, 事件所在控件)，由调用方决定滚动哪个视图。"""
+    windowing = widget.tk.call("tk", "windowingsystem")
+
+    def handler(on_scroll):
+        def _h(e):
+            px = wheel_pixels(e, windowing)
+            if px: on_scroll(px, e.widget)
+        return _h
+
+    widget.bind_all("<MouseWheel>", handler(on_v), add="+")
+    widget.bind_all("<Shift-MouseWheel>", handler(on_h), add="+")
+    widget.bind_all("<Button-4>", handler(on_v), add="+")
+    widget.bind_all("<Button-5>", handler(on_v), add="+")
+    widget.bind_all("<Shift-Button-4>", handler(on_h), add="+")
+    widget.bind_all("<Shift-Button-5>", handler(on_h), add="+")
+    widget.bind_all("<Button-6>", handler(on_h), add="+")
+    widget.bind_all("<Button-7>", handler(on_h), add="+")
@@ -1,14 +1,23 @@
 import tkinter as tk
+from tkinter import font as tkfont
 from tkinter import ttk
 from utils.labels import col_label
+from utils.scoll import bind_mousewheel
 from utils.text import truncate_with_ellipsis
 
+# 差异高亮配色
+MARK_COLORS = {"added": "#d9f2d9", "modified": "#fff2b3", "moved": "#dbe8fb"}
+
 class GridView(ttk.Frame):
-    def __init__(self, master, display_limit: int, on_focus_in, on_focus_out):
+    _wheel_bound = False
+
+    def __init__(self, master, display_limit: int, on_focus_in, on_focus_out, scheduler, on_header=None):
         super().__init__(master)
         self.display_limit = display_limit
         self.on_focus_in = on_focus_in
         self.on_focus_out = on_focus_out
+        self.on_header = on_header   # 双击列头 (c)
+        self.scheduler = scheduler
 
         self.canvas = tk.Canvas(self, highlightthickness=0)
         self.vbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
@@ -26,8 +35,19 @@ class GridView(ttk.Frame):
         self.canvas.bind("<Configure>", lambda e: self.canvas.itemconfig(self.win, anchor="nw"))
 
         self.entries = []   # 2D Entry 引用
+        self._build_gen = 0
+        self._row_marks: dict[int, str] = {}
+        self._cell_marks: dict[tuple[int, int], str] = {}
+        self._painted: set[tuple[int, int]] = set()
+        self._plain_bg = None
+        self._pending_view = None
+        self._scroll_left = [0.0, 0.0]   # 待滚动像素 (x, y)，按帧逐步消化
+        # 滚轮只全局绑定一次，按事件控件分发到所在的 GridView
+        if not GridView._wheel_bound:
+            GridView._wheel_bound = True
+            bind_mousewheel(self, lambda px, w: _wheel(w, 0, px), lambda px, w: _wheel(w, px, 0))
 
-    def rebuild(self, data: list[list[str]], cell_px=(120,34), cell_char_w=14, cell_ipady=2):
+    def rebuild(self, data: list[list[str]], cell_px=(120,34), cell_char_w=14, cell_ipady=2, col_widths=None):
         for w in self.holder.winfo_children(): w.destroy()
         rows = len(data); cols = len(data[0]) if rows else 0
         # 头
@@ -35,31 +55,174 @@ class GridView(ttk.Frame):
         for c in range(cols):
             hdr = ttk.Frame(self.holder, borderwidth=1, relief="solid", padding=2)
             hdr.grid(row=0, column=c+1, sticky="nsew", padx=1, pady=1)
-            ttk.Label(hdr, text=col_label(c), width=6).pack(side="left")
+            lbl = ttk.Label(hdr, text=col_label(c)); lbl.pack(side="left")
+            if self.on_header:
+                for w in (hdr, lbl): w.bind("<Double-Button-1>", lambda e, cc=c: self.on_header(cc))
+        # 列宽由列的 minsize 决定，单元格随列拉伸；改列宽只需每列一次调用
+        self.set_col_widths(col_widths or [cell_px[0]] * cols)
 
+        # 表体按帧分片构建，大表不阻塞首屏与输入
         self.entries = []
-        for r in range(rows):
+        self._row_marks, self._cell_marks, self._painted = {}, {}, set()
+        self._build_gen += 1
+        self._build_rows(self._build_gen, data, 0, (cell_px, cell_char_w, cell_ipady))
+
+    # 滚动
+    def scroll_pixels(self, dx: float, dy: float) -> None:
+        self._scroll_left[0] += dx; self._scroll_left[1] += dy
+        self.scheduler.request(("scroll", id(self)), self._scroll_step)
+
+    def see_cell(self, r: int, c: int) -> None:
+        self.scheduler.request(("see", id(self)), self._see_cell, r, c)
+
+    def set_col_widths(self, widths: list[int]) -> None:
+        for c, w in enumerate(widths): self.holder.columnconfigure(c+1, minsize=w)
+
+    def cell_font(self) -> tkfont.Font:
+        return tkfont.nametofont("TkTextFont")   # tk.Entry 的默认字体
+
+    def view_state(self) -> tuple[float, float]:
+        return (self.canvas.xview()[0], self.canvas.yview()[0])
+
+    def restore_view(self, x: float, y: float) -> None:
+        """在（分片）构建完成后恢复滚动位置。"""
+        self._pending_view = (x, y)
+
+    def destroy(self):
+        # 丢弃尚未执行的分片构建与滚动请求
+        self._build_gen += 1
+        for kind in ("rebuild", "scroll", "see", "view"):
+            self.scheduler.cancel((kind, id(self)))
+        super().destroy()
+
+    # 高亮
+    def set_marks(self, rows: dict[int, str], cells: dict[tuple[int, int], str]) -> None:
+        """按类型（见 MARK_COLORS）标记整行或单元格，单元格标记优先；尚未构建的行在构建时着色。"""
+        stale = self._painted
+        self._row_marks, self._cell_marks, self._painted = rows, cells, set()
+        for r, c in stale: self._paint(r, c)
+        built = len(self.entries)
+        for r in rows:
+            if r < built:
+                for c in range(len(self.entries[r])): self._paint(r, c)
+        for r, c in cells:
+            if r < built: self._paint(r, c)
+
+    def clear_marks(self) -> None:
+        self.set_marks({}, {})
+
+    # 内部
+    def _build_rows(self, gen, data, start, cell_opts):
+        if gen != self._build_gen: return   # 已被新的 rebuild 取代
+        cell_px, cell_char_w, cell_ipady = cell_opts
+        cols = len(data[0]) if data else 0
+        r = start
+        while r < len(data):
             rh = ttk.Frame(self.holder, borderwidth=1, relief="solid", padding=2)
             rh.grid(row=r+1, column=0, sticky="nsew", padx=1, pady=1)
             ttk.Label(rh, text=str(r+1), width=6).pack(side="left")
 
             row_entries = []
             for c in range(cols):
-                cell = tk.Frame(self.holder, width=cell_px[0], height=cell_px[1], bd=1, relief="solid")
-                cell.grid(row=r+1, column=c+1, padx=1, pady=1)
+                cell = tk.Frame(self.holder, width=1, height=cell_px[1], bd=1, relief="solid")
+                cell.grid(row=r+1, column=c+1, padx=1, pady=1, sticky="nsew")
                 cell.grid_propagate(False)
+                cell.pack_propagate(False)   # Entry 用 pack 放置，否则其字符宽会撑开单元格，列无法变窄
                 e = tk.Entry(cell, width=cell_char_w)
                 e.pack(fill="both", expand=True, ipady=cell_ipady)
 
                 def _in(ev, rr=r, cc=c, ent=e):
                     self.on_focus_in(rr, cc)
+                    self.see_cell(rr, cc)
                 def _out(ev, rr=r, cc=c, ent=e):
                     self.on_focus_out(rr, cc, ent.get())
 
                 e.bind("<FocusIn>", _in)
                 e.bind("<FocusOut>", _out)
+                e.bind("<Up>", lambda ev, rr=r, cc=c: self._move_focus(rr - 1, cc))
+                e.bind("<Down>", lambda ev, rr=r, cc=c: self._move_focus(rr + 1, cc))
 
                 # 初次展示省略
                 e.insert(0, truncate_with_ellipsis(data[r][c], self.display_limit))
                 row_entries.append(e)
             self.entries.append(row_entries)
+            for c in range(cols):
+                if r in self._row_marks or (r, c) in self._cell_marks: self._paint(r, c)
+            r += 1
+            if self.scheduler.over_budget() or (start == 0 and r >= 50): break
+        if r < len(data):
+            self.scheduler.request(("rebuild", id(self)), self._build_rows, gen, data, r, cell_opts)
+        elif self._pending_view:
+            self.scheduler.request(("view", id(self)), self._apply_view)
+
+    def _apply_view(self):
+        x, y = self._pending_view
+        self._pending_view = None
+        self.canvas.xview_moveto(x); self.canvas.yview_moveto(y)
+
+    def _paint(self, r: int, c: int):
+        try:
+            ent = self.entries[r][c]
+        except IndexError:
+            return
+        if self._plain_bg is None: self._plain_bg = ent.cget("background")
+        kind = self._cell_marks.get((r, c)) or self._row_marks.get(r)
+        ent.configure(background=MARK_COLORS.get(kind, self._plain_bg))
+        if kind: self._painted.add((r, c))
+        else: self._painted.discard((r, c))
+
+    def _move_focus(self, r: int, c: int):
+        if 0 <= r < len(self.entries) and 0 <= c < len(self.entries[r]):
+            self.entries[r][c].focus_set()
+        return "break"
+
+    def _scroll_step(self):
+        # 缓动：每帧消化剩余位移的一半，余量很小时一步到位
+        steps = [v if abs(v) <= 2 else v / 2 for v in self._scroll_left]
+        moved = self._move_by(*steps)
+        self._scroll_left = [0.0 if not m else v - s for v, s, m in zip(self._scroll_left, steps, moved)]
+        if any(self._scroll_left):
+            self.scheduler.request(("scroll", id(self)), self._scroll_step)
+
+    def _move_by(self, dx: float, dy: float) -> tuple[bool, bool]:
+        """按像素移动视图，返回各方向是否仍可继续移动。"""
+        region = self.canvas.bbox("all")
+        if not region: return (False, False)
+        x0, y0, x1, y1 = region
+        moved = []
+        for d, total, view, pos, moveto in (
+            (dx, x1 - x0, self.canvas.winfo_width(), self.canvas.canvasx(0) - x0, self.canvas.xview_moveto),
+            (dy, y1 - y0, self.canvas.winfo_height(), self.canvas.canvasy(0) - y0, self.canvas.yview_moveto),
+        ):
+            limit = max(0, total - view)
+            target = min(max(pos + d, 0), limit)
+            if d and total > 0 and target != pos:
+                moveto(target / total)
+            moved.append(bool(d) and 0 < target < limit)
+        return (moved[0], moved[1])
+
+    def _see_cell(self, r: int, c: int):
+        try:
+            cell = self.entries[r][c].master
+        except IndexError:
+            return
+        region = self.canvas.bbox("all")
+        if not region: return
+        x0, y0, _, _ = region
+        left, top = self.canvas.canvasx(0) - x0, self.canvas.canvasy(0) - y0
+        dx = _overflow(cell.winfo_x(), cell.winfo_width(), left, self.canvas.winfo_width())
+        dy = _overflow(cell.winfo_y(), cell.winfo_height(), top, self.canvas.winfo_height())
+        if dx or dy: self._move_by(dx, dy)
+
+
+def _wheel(widget, dx: float, dy: float):
+    while widget is not None and not isinstance(widget, GridView):
+        widget = getattr(widget, "master", None)
+    if widget is not None: widget.scroll_pixels(dx, dy)
+
+
+def _overflow(start: int, size: int, view_start: float, view_size: int) -> float:
+    """单元格超出可视区时需要滚动的像素（负数向上/左）。"""
+    if start < view_start: return start - view_start
+    if start + size > view_start + view_size: return min(start - view_start, start + size - view_start - view_size)
+    return 0
@@ -16,6 +16,10 @@ class MainWindow(tk.Tk):
         self.pane.add(self.left, stretch="always")
         self.pane.add(self.right, width=420)
 
+        # 左侧多文档标签页
+        self.tabs = ttk.Notebook(self.left)
+        self.tabs.pack(fill="both", expand=True)
+
         # 底部状态栏
         self.status_label = ttk.Label(self, textvariable=self.status_var, anchor="w")
         self.status_label.pack(fill="x", side="bottom")